@@ -1,29 +1,295 @@
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+import httpx
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from selectolax.lexbor import LexborHTMLParser as HTMLParser
+from lxml import etree
+import lxml.html
+from urllib.parse import urldefrag, urljoin, urlparse
 import json
+import orjson
 import re
-import csv
 from openai import OpenAI
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterable, Optional, Set, Tuple
 import time
 import random
 import os
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache, wraps
+import gzip
+import hashlib
+import sqlite3
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, CancelledError, as_completed, wait, TimeoutError as FutureTimeoutError
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from pricing_pipeline import run_pipeline
+
+# Precompiled URL classifiers (one C-level scan per URL instead of a keyword loop)
+_HIGH_RE = re.compile(r'pricing|price|plan|buy|subscribe|order|checkout', re.I)
+_MED_RE = re.compile(r'product|feature|service|solution|package|tier', re.I)
+_PRICING_RE = re.compile(r'pricing|price|plan|subscri(?:be|ption)|buy|order', re.I)
+_PRICE_HINT_RE = re.compile(r'price|plan|\$|€|/mo\b|/month', re.I)
+_BAD_EXT = frozenset({
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.ico', '.zip', '.exe',
+    '.css', '.js', '.woff', '.woff2',
+})
+
+# Conventional pricing paths, probed before any link discovery
+_COMMON_PRICING_PATHS = ('/pricing', '/plans', '/price', '/plan', '/subscription')
+
+# Sitemaps and pages repeat the same URLs many times
+_cached_urlparse = lru_cache(maxsize=4096)(urlparse)
+
+# Local cache of AI results (keyed by page content) and fetched pages/sitemaps (keyed by URL)
+_CACHE_DB = os.getenv("PRICING_CACHE_DB", "pricing_cache.db")
+_PAGE_CACHE_TTL = 24 * 3600  # seconds a fetched page or sitemap is reused
+_LINK_CACHE_TTL = 7 * 24 * 3600  # seconds an AI pricing-link pick for a link set is reused
+_REVALIDATE_TTL = 7 * 24 * 3600  # seconds a page's ETag/Last-Modified are kept for conditional refetches
+
+# Model used for every AI call; part of the AI cache key (see _AI_CACHE_SALT)
+_AI_MODEL = "grok-code-fast-1"
+
+# Outbound HTTP limits: requests in flight across all hosts, in flight per host, and the
+# minimum spacing in seconds between request starts to one host
+_MAX_HTTP_IN_FLIGHT = 50
+_PER_HOST_IN_FLIGHT = 2
+_PER_HOST_INTERVAL = 0.5
+
+# Longest one browser call may take once it has a tab (navigation and rendering)
+_BROWSER_CALL_TIMEOUT = 120
+
+# Upper bound on HTML bytes downloaded for static extraction
+_MAX_HTML_BYTES = 2_000_000
+
+# Page text handed to the AI is capped at this many characters
+_MAX_TEXT_CHARS = 50_000
+
+# Elements that reveal pricing when clicked, as one union selector limited to visible matches
+_PRICING_TRIGGERS = (
+    ':is(a[href*="pricing"], button:has-text("Pricing"), [data-testid*="pricing"], '
+    '.pricing-tab, [class*="pricing"] button) >> visible=true'
+)
+
+# Browser resource types that never affect the extracted text
+_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'font', 'media', 'stylesheet', 'websocket', 'eventsource'})
+
+# hrefs that never lead to a crawlable page
+_SKIP_RE = re.compile(r'^(?:javascript:|mailto:|tel:|#)', re.I)
+
+# Plain-HTTP results that mean the page doesn't exist, so no browser retry is attempted
+_GONE_ERRORS = ("Error: HTTP 404", "Error: HTTP 410")
+
+# Content types that can never be a pricing page, rejected before the body is read
+_NON_HTML_TYPES = ('image/', 'audio/', 'video/', 'font/', 'application/pdf', 'application/zip', 'application/gzip')
+
+# Advertise Brotli only when a decoder is installed; requests/urllib3 and httpx both pick it up
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    _ACCEPT_ENCODING = 'gzip, deflate'
+
+# Fixed system prompts for pricing analysis. Everything repeated across calls lives here so
+# providers with prompt caching reuse it; user messages carry only the page content.
+_PLAN_SCHEMA = """{
+  "name": "Plan Name",
+  "description": "Plan description",
+  "pricing_tiers": [
+    {
+      "type": "recurring",
+      "usage_type": "licensed",
+      "billing_period": "monthly",
+      "price": 0.0,
+      "currency": "usd",
+      "features": ["feature1", "feature2"]
+    }
+  ]
+}"""
+
+_PRICING_SYSTEM_PROMPT = f"""You are a helpful assistant that analyzes pricing content and extracts structured pricing information.
+
+The user sends one pricing page as its URL followed by its text content. Extract its pricing to this JSON format, with one entry in "plans" per plan:
+{{"currency": "usd", "plans": [{_PLAN_SCHEMA}]}}
+
+Return ONLY valid JSON."""
+
+_BATCH_PRICING_SYSTEM_PROMPT = f"""You are a helpful assistant that analyzes pricing content and extracts structured pricing information.
+
+The user sends several pricing pages. Each page is delimited by <<DOC n>> and <<END>>; n is its page number and the url follows the opening marker. Return a JSON array with exactly one object per page, in page order:
+[{{"page": 1, "url": "https://example.com/pricing", "currency": "usd", "plans": [{_PLAN_SCHEMA}]}}]
+
+Use an empty "plans" list for pages without pricing. Return ONLY valid JSON."""
+
+# Cached AI analyses are only valid for the model and prompts that produced them; any
+# change to either yields new cache keys instead of serving stale answers
+_AI_CACHE_SALT = hashlib.blake2b(
+    '\0'.join((_AI_MODEL, _PRICING_SYSTEM_PROMPT, _BATCH_PRICING_SYSTEM_PROMPT)).encode('utf-8'), digest_size=8
+).hexdigest()
+
+_JSON_DECODER = json.JSONDecoder()
+
+def _parse_json_object(text: str) -> Optional[Dict]:
+    """Return the first JSON object embedded in text (e.g. an AI reply), or None"""
+    return _parse_embedded_json(text, '{', dict)
+
+def _parse_json_array(text: str) -> Optional[List]:
+    """Return the first JSON array embedded in text, or None"""
+    return _parse_embedded_json(text, '[', list)
+
+def _parse_embedded_json(text: str, opener: str, kind: type):
+    idx = text.find(opener)
+    while idx != -1:
+        try:
+            result, _ = _JSON_DECODER.raw_decode(text, idx)
+            if isinstance(result, kind):
+                return result
+        except ValueError:
+            pass
+        idx = text.find(opener, idx + 1)
+    return None
+
+@lru_cache(maxsize=100_000)
+def _is_crawlable_url(url: str) -> bool:
+    """True for http(s) URLs with a host that don't point at a static asset (memoized)"""
+    try:
+        # Cheap prefix test before parsing; only http(s) URLs are crawlable. Schemes are
+        # case-insensitive, so HTTP:// and Https:// links count too
+        if not url[:8].lower().startswith(('http://', 'https://')):
+            return False
+        
+        parsed = _cached_urlparse(url)
+        if not parsed.netloc:
+            return False
+        
+        # Avoid common non-content URLs
+        return os.path.splitext(parsed.path)[1].lower() not in _BAD_EXT
+    except Exception:
+        return False
+
+def _has_pricing_hints(content: str) -> bool:
+    """True when extracted text is substantial and mentions prices or plans"""
+    return len(content) > 100 and not content.startswith("Error") and _PRICE_HINT_RE.search(content) is not None
+
+def _bounded_text(strings: Iterable[str], limit: int = _MAX_TEXT_CHARS) -> str:
+    """Join stripped, non-empty text nodes with spaces, stopping once limit characters are collected"""
+    parts = []
+    size = 0
+    for text in strings:
+        text = (text or '').strip()
+        if not text:
+            continue
+        parts.append(text)
+        size += len(text) + 1
+        if size >= limit:
+            break
+    return " ".join(parts)[:limit]
+
+def _element_text(element) -> str:
+    """Whitespace-normalized text of an lxml element, like BeautifulSoup's get_text(" ", strip=True)"""
+    return _bounded_text(element.itertext())
+
+# Second-level labels under country TLDs that are public suffixes themselves (foo.co.uk, foo.com.au)
+_SECOND_LEVEL_SUFFIXES = frozenset({'co', 'com', 'net', 'org', 'gov', 'edu', 'ac', 'ne', 'or', 'go'})
+
+@lru_cache(maxsize=4096)
+def _registrable_domain(host: str) -> str:
+    """Approximate registrable domain of a host: app.foo.com -> foo.com, www.foo.co.uk -> foo.co.uk"""
+    labels = host.lower().rstrip('.').split('.')
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL_SUFFIXES:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+def _is_third_party(request) -> bool:
+    """True when a browser request goes outside the registrable domain of the frame that
+    made it, so sibling subdomains (api.foo.com for a page on app.foo.com) stay first-party"""
+    try:
+        frame_host = _cached_urlparse(request.frame.url).hostname or ''
+    except Exception:
+        return False
+    host = _cached_urlparse(request.url).hostname or ''
+    if not frame_host or not host:
+        return False
+    return _registrable_domain(host) != _registrable_domain(frame_host)
+
+async def _abort_heavy_resources(route):
+    """Playwright route handler: skip downloads that never affect the extracted text.
+    
+    Documents and scripts always load so pages still render; other requests to third-party
+    hosts (ads, analytics, trackers) are dropped.
+    """
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCE_TYPES or (
+        request.resource_type not in ('document', 'script') and _is_third_party(request)
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
+def _on_browser_loop(coro_method):
+    """Expose an async Playwright method as a blocking call from any worker thread.
+    
+    The browser lives on one event loop thread; calls from concurrently processed sites
+    are scheduled onto it and run as separate tasks, so several pages load at once.
+    """
+    @wraps(coro_method)
+    def wrapper(self, *args, **kwargs):
+        # Work queued on a stopped loop would never run, so refuse it once shutdown starts
+        loop = self._browser_loop
+        if self._browser_closing or loop.is_closed() or not loop.is_running():
+            raise RuntimeError("Browser is shut down")
+        
+        future = asyncio.run_coroutine_threadsafe(coro_method(self, *args, **kwargs), loop)
+        try:
+            return future.result(timeout=_BROWSER_CALL_TIMEOUT)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PlaywrightTimeoutError(f"{coro_method.__name__} did not finish within {_BROWSER_CALL_TIMEOUT}s")
+        except CancelledError:
+            raise RuntimeError("Browser is shut down")
+    return wrapper
+
+def _holding_tab(method):
+    """Let a blocking browser call start only once one of the warm tabs is free.
+    
+    Callers queue here, on the worker thread, so _BROWSER_CALL_TIMEOUT measures loading
+    and rendering rather than the wait for a tab when many sites render at once.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._tab_slots:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class PricingExtractor:
     def __init__(self, xai_api_key: str = None, your_site_url: str = "https://example.com", your_site_name: str = "PricingExtractor"):
         
         api_key = xai_api_key
         
+        # Attribution headers; unset values are dropped since httpx rejects None
+        self.extra_headers = {
+            key: value for key, value in {
+                "HTTP-Referer": your_site_url,
+                "X-Title": your_site_name,
+            }.items() if value
+        }
+        
+        # One long-lived HTTP/2 client so every AI call reuses the same TLS connection
         self.client = OpenAI(
             api_key=api_key,
             base_url="https://api.x.ai/v1",  # The xAI API endpoint
+            default_headers=self.extra_headers,
+            http_client=httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=8),
+                timeout=httpx.Timeout(60.0, connect=5.0)
+            )
         )
-        self.extra_headers = {
-            "HTTP-Referer": your_site_url,
-            "X-Title": your_site_name,
-        }
+        
+        # Cap in-flight AI requests across all concurrently processed sites
+        self.llm_concurrency = 8
+        self._llm_slots = threading.BoundedSemaphore(self.llm_concurrency)
         
         # Create a session with proper headers to avoid bot detection
         self.session = requests.Session()
@@ -31,41 +297,124 @@ class PricingExtractor:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Encoding': _ACCEPT_ENCODING,
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         })
         
+        # Size the connection pool for concurrent fetches so keep-alive sockets get reused
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Static page fetches share one HTTP/2 client so concurrent sites multiplex over
+        # pooled connections (HTTP/2 forbids the Connection header, so it is left out).
+        # Idle connections are kept for 75s so a site's later candidate pages skip the
+        # DNS lookup and TLS handshake entirely.
+        self.http = httpx.Client(
+            http2=True,
+            headers={k: v for k, v in self.session.headers.items() if k != 'Connection'},
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=75),
+            timeout=httpx.Timeout(10.0, connect=5.0)
+        )
+        
+        # Shared pool for all blocking HTTP and parsing work. max_workers caps how much
+        # one call fans out; the pool itself is sized for several sites doing that at once
+        self.max_workers = 16
+        self.executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix='scrape-io')
+        
+        # Politeness: at most per_host_concurrency requests in flight and per_host_interval
+        # seconds between request starts to the same host, under a global in-flight cap
+        self.per_host_concurrency = _PER_HOST_IN_FLIGHT
+        self.per_host_interval = _PER_HOST_INTERVAL
+        self._http_slots = threading.BoundedSemaphore(_MAX_HTTP_IN_FLIGHT)
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+        
+        # Memoized URL probes so repeated lookups skip the network: final URL (or None) of
+        # plain HTTP probes, and existence after the Playwright retry
+        self._http_probe_cache = {}
+        self._url_exists_cache = {}
+        
+        # host -> whether plain HTTP yields pricing text there; False sends the host straight to Playwright
+        self._static_hosts = {}
+        
+        # Persistent AI and page caches shared by all worker threads
+        self._cache_db = sqlite3.connect(_CACHE_DB, check_same_thread=False)
+        self._cache_db.execute("CREATE TABLE IF NOT EXISTS ai_cache (h BLOB PRIMARY KEY, json TEXT)")
+        self._cache_db.execute("CREATE TABLE IF NOT EXISTS page_cache (h BLOB PRIMARY KEY, fetched REAL, body BLOB)")
+        self._cache_lock = threading.Lock()
+        
+        # All Playwright calls run on this event loop thread (see _on_browser_loop)
+        self._browser_loop = asyncio.new_event_loop()
+        threading.Thread(target=self._browser_loop.run_forever, name='playwright', daemon=True).start()
+        
         # Initialize Playwright browser (will be started when needed)
         self.playwright = None
         self.browser = None
         self.context = None
+        self.max_pages = 4  # browser tabs loading pages at the same time
+        self._tab_slots = threading.BoundedSemaphore(self.max_pages)  # see _holding_tab
+        self._pages = None  # asyncio.Queue of warm tabs (see _warm_page)
+        self._browser_start_lock = asyncio.Lock()
+        self._browser_closing = False  # set by __exit__; browser calls fail fast afterwards
         
     def __enter__(self):
         """Context manager entry"""
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Context manager exit - cleanup Playwright resources"""
-        self.close_playwright()
-        
-    def close_playwright(self):
+        """Context manager exit - cleanup Playwright resources and worker threads"""
+        # Site threads may still be running; from here on their browser calls fail fast
+        # instead of queueing onto a loop that is about to stop
+        self._browser_closing = True
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_browser(), self._browser_loop).result(timeout=_BROWSER_CALL_TIMEOUT)
+        except Exception as e:
+            print(f"⚠️ Failed to close browser cleanly: {e}")
+        self._browser_loop.call_soon_threadsafe(self._browser_loop.stop)
+        self.executor.shutdown(wait=False)
+        self.http.close()
+        self.session.close()
+        self.client.close()
+        self._cache_db.close()
+    
+    @_on_browser_loop
+    async def close_playwright(self):
         """Close Playwright browser and context"""
+        await self._close_browser()
+    
+    async def _close_browser(self):
         if self.context:
-            self.context.close()
+            await self.context.close()
             self.context = None
+            self._pages = None
         if self.browser:
-            self.browser.close()
+            await self.browser.close()
             self.browser = None
         if self.playwright:
-            self.playwright.stop()
+            await self.playwright.stop()
             self.playwright = None
     
-    def init_playwright(self):
+    @_on_browser_loop
+    async def init_playwright(self):
         """Initialize Playwright browser if not already done"""
-        if not self.playwright:
-            self.playwright = sync_playwright().start()
-            self.browser = self.playwright.chromium.launch(
+        await self._ensure_browser()
+    
+    async def _ensure_browser(self):
+        async with self._browser_start_lock:
+            if self._pages is not None:
+                return
+            if self._browser_closing:
+                raise RuntimeError("Browser is shut down")
+            if not self.playwright:
+                self.playwright = await async_playwright().start()
+            self.browser = self.browser or await self.playwright.chromium.launch(
                 headless=True,
                 args=[
                     '--no-sandbox',
@@ -75,19 +424,28 @@ class PricingExtractor:
                     '--disable-blink-features=AutomationControlled'
                 ]
             )
-            self.context = self.browser.new_context(
+            self.context = self.context or await self.browser.new_context(
                 viewport={'width': 1920, 'height': 1080},
                 user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
                 ignore_https_errors=True
             )
+            # Registered once for the whole context instead of per page
+            await self.context.route('**/*', _abort_heavy_resources)
+            
+            # Warm tabs are opened up front and handed out by _warm_page
+            pages = asyncio.Queue()
+            for _ in range(self.max_pages):
+                pages.put_nowait(await self.context.new_page())
+            self._pages = pages
     
-    def sync_playwright_cookies_to_requests(self):
-        """Copy cookies from Playwright browser context to requests session."""
+    @_on_browser_loop
+    async def sync_playwright_cookies_to_requests(self):
+        """Copy cookies from Playwright browser context to the HTTP clients."""
         if not self.context:
             return
     
         try:
-            cookies = self.context.cookies()
+            cookies = await self.context.cookies()
             jar = requests.cookies.RequestsCookieJar()
             for cookie in cookies:
                 jar.set(
@@ -97,110 +455,207 @@ class PricingExtractor:
                     path=cookie.get("path", "/"),
                 )
             self.session.cookies = jar
-            print(f"🍪 Synced {len(cookies)} cookies from Playwright to requests session")
+            for cookie in cookies:
+                self.http.cookies.set(
+                    cookie["name"],
+                    cookie["value"],
+                    domain=cookie.get("domain", ""),
+                    path=cookie.get("path", "/"),
+                )
+            print(f"🍪 Synced {len(cookies)} cookies from Playwright to HTTP clients")
         except Exception as e:
             print(f"⚠️ Failed to sync cookies: {e}")
-    def extract_pricing_content(self, url: str) -> str:
+
+    def _page_cache_get(self, key: str, ttl: float = _PAGE_CACHE_TTL) -> Optional[bytes]:
+        """Return a cached page/sitemap body stored within the last ttl seconds, or None"""
+        h = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        with self._cache_lock:
+            row = self._cache_db.execute(
+                "SELECT body FROM page_cache WHERE h = ? AND fetched > ?", (h, time.time() - ttl)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def _page_cache_put(self, key: str, body: bytes):
+        h = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        with self._cache_lock:
+            self._cache_db.execute("INSERT OR REPLACE INTO page_cache VALUES (?, ?, ?)", (h, time.time(), body))
+            self._cache_db.commit()
+    
+    def extract_pricing_content(self, url: str, force_rescrape: bool = False) -> str:
         print(f"📄 Extracting content from: {url}")
+        
+        # Reuse text extracted on a recent run unless a fresh scrape is requested
+        if not force_rescrape:
+            cached = self._page_cache_get('page:' + url)
+            if cached is not None:
+                print(f"💾 Using cached content ({len(cached)} bytes)")
+                return cached.decode('utf-8')
+        
+        # Static HTML often already has the prices; try it first unless this host is known
+        # to need JavaScript rendering
+        host = _cached_urlparse(url).netloc
+        static_content = None
+        if self._static_hosts.get(host, True):
+            static_content = self._extract_with_requests(url)
+            # A missing page is missing for the browser too; don't render or refetch it
+            if static_content.startswith(_GONE_ERRORS):
+                print(f"❌ {static_content} for {url}")
+                return static_content
+            if _has_pricing_hints(static_content):
+                print(f"✅ Requests extracted {len(static_content)} characters")
+                self._static_hosts[host] = True
+                self._page_cache_put('page:' + url, static_content.encode('utf-8'))
+                return static_content
     
-        # First try with Playwright (handles dynamic content)
+        # Then try Playwright (handles dynamic content)
         playwright_content = self._extract_with_playwright(url)
         if playwright_content and len(playwright_content) > 100:
             print(f"✅ Playwright extracted {len(playwright_content)} characters")
+            # Rendering found what plain HTML didn't; send this host's next pages straight to the browser
+            if static_content is not None:
+                self._static_hosts.setdefault(host, False)
+            self._page_cache_put('page:' + url, playwright_content.encode('utf-8'))
             return playwright_content
     
-        # 🆕 Sync cookies before switching to requests
-        self.sync_playwright_cookies_to_requests()
-    
-        # Fallback to requests for static content
+        # Fallback to requests for static content; the first plain fetch is reused when it
+        # returned usable text, otherwise refetch with the browser's cookies
         print("🔄 Playwright failed or insufficient content, trying requests...")
-        requests_content = self._extract_with_requests(url)
+        if static_content and len(static_content) > 100 and not static_content.startswith("Error"):
+            requests_content = static_content
+        elif playwright_content.startswith("Error: HTTP"):
+            # The browser got an HTTP error status too; a cookie refetch won't change that
+            return playwright_content
+        else:
+            # 🆕 Sync cookies before switching to requests
+            self.sync_playwright_cookies_to_requests()
+            requests_content = self._extract_with_requests(url)
         if requests_content and len(requests_content) > 100:
             print(f"✅ Requests extracted {len(requests_content)} characters")
+            if not requests_content.startswith("Error"):
+                self._page_cache_put('page:' + url, requests_content.encode('utf-8'))
             return requests_content
     
         return "Error: Could not extract content with either method"
-    def _extract_with_playwright(self, url: str) -> str:
-        """Extract content using Playwright to handle JavaScript-rendered pages"""
+    
+    @asynccontextmanager
+    async def _warm_page(self):
+        """Check out one of the warm browser tabs, waiting if all are busy, and reset it
+        to about:blank afterwards instead of paying for a new tab per page."""
+        while True:
+            await self._ensure_browser()
+            pages = self._pages
+            try:
+                page = await asyncio.wait_for(pages.get(), timeout=5)
+                break
+            except asyncio.TimeoutError:
+                # All tabs busy: keep waiting, relaunching first if the pool was discarded
+                continue
         try:
-            self.init_playwright()
-            
-            page = self.context.new_page()
-            
-            # Set up request interception to block unnecessary resources
-            def route_handler(route):
-                if route.request.resource_type in ['image', 'font', 'media']:
-                    route.abort()
-                else:
-                    route.continue_()
-            
-            page.route('**/*', route_handler)
-            
-            # Navigate to page with longer timeout for dynamic content
-            page.goto(url, wait_until='networkidle', timeout=60000)  # Increased to 60s
+            yield page
+        finally:
+            try:
+                await page.goto('about:blank')
+            except Exception:
+                # A tab that cannot navigate is swapped for a fresh one
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+                try:
+                    page = await self.context.new_page()
+                except Exception:
+                    # The browser itself is gone (e.g. Chromium crashed); drop it so the
+                    # next checkout relaunches instead of waiting on an emptying pool
+                    page = None
+                    if self._pages is pages:
+                        await self._discard_browser()
+            if page is not None:
+                pages.put_nowait(page)
+    
+    async def _discard_browser(self):
+        """Forget a broken browser and its tab pool so _ensure_browser starts a new one"""
+        context, browser = self.context, self.browser
+        self._pages = self.context = self.browser = None
+        for resource in (context, browser):
+            if resource is not None:
+                try:
+                    await resource.close()
+                except Exception:
+                    pass
+    
+    @_holding_tab
+    @_on_browser_loop
+    async def _render_pricing_page(self, url: str) -> str:
+        """Load a page in the browser, open any pricing tab and return the rendered HTML
+        ("Error: HTTP <status>" on HTTP errors)"""
+        async with self._warm_page() as page:
+            # DOMContentLoaded instead of networkidle: analytics beacons can keep the
+            # network busy for the whole timeout without changing the page content
+            response = await page.goto(url, wait_until='domcontentloaded', timeout=30000)
             
-            # Wait for potential dynamic content to load
-            page.wait_for_timeout(3000)
+            # Missing pages are reported here instead of by a separate existence check
+            if response and response.status >= 400:
+                print(f"❌ Playwright got HTTP {response.status} for {url}")
+                return f"Error: HTTP {response.status}"
             
-            # Try to find and click common "pricing" elements that might be hidden behind interactions
-            pricing_selectors = [
-                'a[href*="pricing"]',
-                'button:has-text("Pricing")',
-                '[data-testid*="pricing"]',
-                '.pricing-tab',
-                '[class*="pricing"] button'
-            ]
+            # Wait for the content area to render rather than a fixed delay
+            try:
+                await page.wait_for_selector('main, [role="main"], [class*="pricing"]', timeout=5000)
+            except PlaywrightTimeoutError:
+                pass
             
-            for selector in pricing_selectors:
-                try:
-                    element = page.query_selector(selector)
-                    if element and element.is_visible():
-                        element.click()
-                        page.wait_for_timeout(2000)
-                        print(f"✅ Clicked pricing element: {selector}")
-                        break
-                except:
-                    continue
+            # Try to find and click common "pricing" elements that might be hidden behind
+            # interactions: one DOM query for the first visible match of any trigger
+            try:
+                element = await page.query_selector(_PRICING_TRIGGERS)
+                if element:
+                    await element.click()
+                    await page.wait_for_timeout(2000)
+                    print("✅ Clicked pricing element")
+            except Exception:
+                pass
             
             # Get the full page content after potential interactions
-            content = page.content()
-            
-            # Parse with BeautifulSoup for cleanup
-            soup = BeautifulSoup(content, 'html.parser')
+            return await page.content()
+    
+    def _extract_with_playwright(self, url: str) -> str:
+        """Extract content using Playwright to handle JavaScript-rendered pages"""
+        try:
+            content = self._render_pricing_page(url)
+            if not content or content.startswith("Error"):
+                return content
             
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'nav', 'footer', 'header', 'iframe']):
-                element.decompose()
+            # Parse once with lxml and strip unwanted elements in a single C pass
+            tree = lxml.html.fromstring(content)
+            etree.strip_elements(tree, etree.Comment, 'script', 'style', 'nav', 'footer', 'header', 'iframe', with_tail=False)
             
             # Try to find main content areas first
-            main_content_selectors = [
-                'main',
-                '[role="main"]',
-                '.main-content',
-                '.content',
-                '#content',
-                '.pricing',
-                '.pricing-container',
-                '.plan-cards',
-                '.price-table'
+            main_content_classes = [
+                'main-content',
+                'content',
+                'pricing',
+                'pricing-container',
+                'plan-cards',
+                'price-table'
             ]
+            main_content_xpath = ' | '.join(
+                ['//main', '//*[@role="main"]', '//*[@id="content"]'] +
+                [f'//*[contains(concat(" ", normalize-space(@class), " "), " {name} ")]' for name in main_content_classes]
+            )
             
             body_text = ""
-            for selector in main_content_selectors:
-                elements = soup.select(selector)
-                for element in elements:
-                    text = element.get_text(separator=" ", strip=True)
-                    if len(text) > len(body_text):
-                        body_text = text
+            for element in tree.xpath(main_content_xpath):
+                text = _element_text(element)
+                if len(text) > len(body_text):
+                    body_text = text
             
             # If no specific content area found, use entire body
             if not body_text or len(body_text) < 100:
-                body = soup.find('body')
-                if body:
-                    body_text = body.get_text(separator=" ", strip=True)
+                body = tree.find('.//body')
+                if body is not None:
+                    body_text = _element_text(body)
             
-            page.close()
-            return body_text[:50000]  # Cap length
+            return body_text  # Already capped at _MAX_TEXT_CHARS
             
         except PlaywrightTimeoutError:
             print(f"❌ Playwright timeout for {url}")
@@ -210,79 +665,75 @@ class PricingExtractor:
             return ""
     
     def _extract_with_requests(self, url: str) -> str:
-        """Fallback method using requests for static content"""
+        """Fallback method using plain HTTP for static content"""
         try:
-            response = self.session.get(url, timeout=10)
+            # Revalidate a previously fetched page so an unchanged one costs only a 304
+            validators = self._page_cache_get('validators:' + url, ttl=_REVALIDATE_TTL)
+            conditional_headers = {}
+            if validators is not None:
+                validators = orjson.loads(validators)
+                if validators.get('etag'):
+                    conditional_headers['If-None-Match'] = validators['etag']
+                if validators.get('last_modified'):
+                    conditional_headers['If-Modified-Since'] = validators['last_modified']
             
-            if response.status_code != 200:
-                return f"Error: HTTP {response.status_code}"
+            with self._host_slot(url), self.http.stream('GET', url, headers=conditional_headers) as response:
+                if response.status_code == 304 and validators is not None:
+                    print(f"💾 {url} not modified, reusing stored text")
+                    return validators['text']
+                if response.status_code != 200:
+                    return f"Error: HTTP {response.status_code}"
+                
+                etag = response.headers.get('etag')
+                last_modified = response.headers.get('last-modified')
+                
+                # PDFs, images and other downloads are never pricing pages; skip before reading the body
+                content_type = response.headers.get('content-type', '').lower()
+                if content_type.startswith(_NON_HTML_TYPES):
+                    return f"Error: Unsupported content type {content_type}"
+                
+                # Cap the download; the text is truncated to _MAX_TEXT_CHARS anyway
+                content = bytearray()
+                for chunk in response.iter_bytes(chunk_size=65536):
+                    content += chunk
+                    if len(content) >= _MAX_HTML_BYTES:
+                        break
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            tree = HTMLParser(bytes(content))
             
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'nav', 'footer', 'header']):
-                element.decompose()
+            # Remove unwanted elements in one native pass instead of a CSS query per tag
+            tree.strip_tags(['script', 'style', 'nav', 'footer', 'header'], recursive=True)
             
-            body = soup.find('body')
-            if not body:
+            if tree.body is None:
                 return "Error: No body tag found"
             
-            return body.get_text(separator=" ", strip=True)[:50000]
+            # Walk text nodes lazily so a huge page never materializes its full text
+            text = _bounded_text(
+                node.text_content for node in tree.body.traverse(include_text=True) if node.tag == '-text'
+            )
+            
+            if etag or last_modified:
+                self._page_cache_put(
+                    'validators:' + url,
+                    orjson.dumps({"etag": etag, "last_modified": last_modified, "text": text})
+                )
+            return text
             
         except Exception as e:
             return f"Error: {str(e)}"
     
-    def _get_all_website_links(self, domain: str) -> List[str]:
+    def _get_all_website_links(self, domain: str) -> Set[str]:
         """Extract all links using Playwright to handle dynamic navigation"""
         all_links = set()
         
         try:
-            self.init_playwright()
-            
-            page = self.context.new_page()
-            page.goto(domain, wait_until='networkidle', timeout=30000)
-            
-            # Wait for dynamic content to load
-            page.wait_for_timeout(2000)
-            
-            # Try to find and extract links from common navigation elements
-            navigation_selectors = [
-                'nav a',
-                'header a',
-                '.navbar a',
-                '.navigation a',
-                '.menu a',
-                'footer a'
-            ]
-            
-            for selector in navigation_selectors:
-                try:
-                    links = page.query_selector_all(selector)
-                    for link in links:
-                        try:
-                            href = link.get_attribute('href')
-                            if href and not href.startswith(('javascript:', 'mailto:', 'tel:', '#')):
-                                full_url = urljoin(domain, href)
-                                if self._is_valid_url(full_url):
-                                    all_links.add(full_url)
-                        except:
-                            continue
-                except:
-                    continue
-            
-            # Also get all links from the page
-            all_a_tags = page.query_selector_all('a[href]')
-            for tag in all_a_tags:
-                try:
-                    href = tag.get_attribute('href')
-                    if href and not href.startswith(('javascript:', 'mailto:', 'tel:', '#')):
-                        full_url = urljoin(domain, href)
-                        if self._is_valid_url(full_url):
-                            all_links.add(full_url)
-                except:
-                    continue
-            
-            page.close()
+            # nav/header/footer links are a subset of all <a href>, so one DOM query covers them
+            # The browser resolves in-page "#section" anchors to homepage#section; drop the
+            # fragment so they collapse back into the page they belong to
+            hrefs = self._render_homepage_links(domain)
+            all_links.update(
+                url for url in (urldefrag(href)[0] for href in hrefs if href) if self._is_valid_url(url)
+            )
             print(f"🔗 Playwright found {len(all_links)} links")
             
         except Exception as e:
@@ -290,38 +741,113 @@ class PricingExtractor:
             # Fallback to requests method
             all_links.update(self._get_links_alternative_method(domain))
         
-        return list(all_links)
+        return all_links
     
-    def _check_url_exists(self, url: str) -> bool:
-        """Check if URL exists using both requests and Playwright (robust version)."""
+    @_holding_tab
+    @_on_browser_loop
+    async def _render_homepage_links(self, domain: str) -> List[str]:
+        """Load the homepage in the browser and return every link's resolved href"""
+        async with self._warm_page() as page:
+            await page.goto(domain, wait_until='domcontentloaded', timeout=30000)
+            
+            # Wait for navigation links to render rather than a fixed delay
+            try:
+                await page.wait_for_selector('a[href]', timeout=5000)
+            except PlaywrightTimeoutError:
+                pass
+            
+            # The browser resolves relative hrefs itself, so no HTML is serialized or re-parsed
+            return await page.eval_on_selector_all('a[href]', 'els => els.map(e => e.href)')
+    
+    @contextmanager
+    def _host_slot(self, url: str):
+        """Hold a request slot for url's host, spacing out request starts to that host.
+        
+        The global slot is taken last so requests queued behind a busy host don't hold one.
+        """
+        host = _cached_urlparse(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = {
+                    "semaphore": threading.BoundedSemaphore(self.per_host_concurrency),
+                    "lock": threading.Lock(),
+                    "last_start": 0.0,
+                }
+        
+        with slot["semaphore"]:
+            with slot["lock"]:
+                delay = slot["last_start"] + self.per_host_interval - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                slot["last_start"] = time.monotonic()
+            with self._http_slots:
+                yield
+    
+    def _probe_url(self, url: str) -> Optional[str]:
+        """Return the final URL after redirects if url answers below 400 over plain HTTP,
+        else None (safe to call from worker threads)"""
         headers = {"User-Agent": "Mozilla/5.0"}
     
-        # 1. GET request first (most reliable)
+        # Probes go over the shared HTTP/2 client, so checks against one origin are
+        # multiplexed on a single connection instead of one socket each
+        # 1. GET request first (most reliable); only the status is needed, not the body
         try:
-            response = self.session.get(url, timeout=8, allow_redirects=True, headers=headers)
-            if response.status_code < 400:
-                return True
+            with self._host_slot(url), self.http.stream('GET', url, timeout=8, headers=headers) as response:
+                if response.status_code < 400:
+                    return str(response.url)
         except Exception:
             pass
     
-        # 2. Playwright fallback for JS-heavy pages
+        # 2. HEAD request as last attempt (cheaper, but unreliable)
         try:
-            self.init_playwright()
-            page = self.context.new_page()
-            response = page.goto(url, wait_until='domcontentloaded', timeout=15000)
-            page.close()
-            if response and response.status and response.status < 400:
-                return True
+            with self._host_slot(url):
+                response = self.http.head(url, timeout=5, headers=headers)
+            return str(response.url) if response.status_code < 400 else None
         except Exception:
-            pass
+            return None
     
-        # 3. HEAD request as last attempt (cheaper, but unreliable)
+    def _probe_urls(self, urls: List[str]) -> Dict[str, Optional[str]]:
+        """Probe URLs concurrently over plain HTTP, memoizing each URL's final URL (or None)"""
+        unprobed = [url for url in dict.fromkeys(urls) if url not in self._http_probe_cache]
+        self._http_probe_cache.update(zip(unprobed, self.executor.map(self._probe_url, unprobed)))
+        return {url: self._http_probe_cache[url] for url in urls}
+    
+    def _check_url_exists(self, url: str) -> bool:
+        """Check if URL exists using both requests and Playwright (robust version)."""
+        return self._check_urls_exist_batch([url])[url]
+    
+    @_holding_tab
+    @_on_browser_loop
+    async def _check_url_exists_with_playwright(self, url: str) -> bool:
+        """Playwright fallback for JS-heavy pages"""
         try:
-            response = self.session.head(url, timeout=5, allow_redirects=True, headers=headers)
-            return response.status_code < 400
+            async with self._warm_page() as page:
+                response = await page.goto(url, wait_until='domcontentloaded', timeout=15000)
+            return bool(response and response.status and response.status < 400)
         except Exception:
             return False
-            # Keep all your existing methods below (they remain the same)
+    
+    def _check_urls_exist_batch(self, urls: List[str]) -> Dict[str, bool]:
+        """Check many URLs at once: HTTP probes run concurrently, Playwright only retries the misses"""
+        urls = list(dict.fromkeys(urls))
+        unchecked = [url for url in urls if url not in self._url_exists_cache]
+        probed = {url: final_url is not None for url, final_url in self._probe_urls(unchecked).items()}
+        
+        # Playwright fallback for JS-heavy pages; the misses load in parallel browser tabs.
+        # A browser that timed out or is shut down counts as a miss
+        def browser_check(url: str) -> bool:
+            try:
+                return self._check_url_exists_with_playwright(url)
+            except Exception:
+                return False
+        
+        misses = [url for url, exists in probed.items() if not exists]
+        probed.update(zip(misses, self.executor.map(browser_check, misses)))
+        self._url_exists_cache.update(probed)
+        
+        return {url: self._url_exists_cache[url] for url in urls}
+    
     def find_pricing_routes(self, domain: str) -> List[str]:
         """Use AI to intelligently find pricing pages from a domain"""
         print(f"🔍 Using AI to find pricing routes for: {domain}")
@@ -334,11 +860,8 @@ class PricingExtractor:
         sitemap_links = self._get_all_sitemap_links(domain)
         print(f"Found {len(sitemap_links)} links from sitemaps")
         
-        # Step 3: Always include the homepage for direct pricing analysis
-        homepage_links = [domain]
-        
-        # Combine all links
-        all_possible_links = list(set(all_links + sitemap_links + homepage_links))
+        # Step 3: Combine all links, always including the homepage for direct pricing analysis
+        all_possible_links = all_links | sitemap_links | {domain}
         print(f"Total unique links to analyze: {len(all_possible_links)}")
         
         if not all_possible_links:
@@ -351,7 +874,7 @@ class PricingExtractor:
         
         return pricing_urls
 
-    def _get_links_alternative_method(self, domain: str) -> List[str]:
+    def _get_links_alternative_method(self, domain: str) -> Set[str]:
         """Alternative method to get links when main method fails"""
         print("🔄 Using alternative method to get links...")
         links = set()
@@ -361,108 +884,122 @@ class PricingExtractor:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
-            response = requests.get(domain, headers=headers, timeout=15)
+            with self._host_slot(domain):
+                response = self.session.get(domain, headers=headers, timeout=15)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Extract links more aggressively
-                for link in soup.find_all('a', href=True):
-                    href = link.get('href', '').strip()
-                    if href and not href.startswith(('javascript:', 'mailto:', 'tel:', '#')):
-                        full_url = urljoin(domain, href)
-                        if self._is_valid_url(full_url):
-                            links.add(full_url)
-                
+                links.update(self._extract_links_from_page(response.content, domain))
                 print(f"Alternative method found {len(links)} links")
             
         except Exception as e:
             print(f"❌ Alternative method also failed: {e}")
         
-        return list(links)
+        return links
     
-    def _extract_links_from_page(self, soup: BeautifulSoup, domain: str) -> List[str]:
+    def _extract_links_from_page(self, html_bytes: bytes, domain: str) -> Set[str]:
         """Extract all valid links from a page"""
         links = set()
         
-        # Try multiple methods to find links
-        methods = [
-            # Method 1: All <a> tags
-            lambda: soup.find_all('a', href=True),
-            # Method 2: Navigation elements
-            lambda: soup.select('nav a, .nav a, .navbar a, .menu a, [role="navigation"] a'),
-            # Method 3: Footer links
-            lambda: soup.select('footer a, .footer a'),
-            # Method 4: Buttons that might be links
-            lambda: soup.select('.button[href], .btn[href], .cta[href]')
-        ]
+        # Single CSS pass over <a> tags and link-like buttons
+        link_selector = 'a[href], .button[href], .btn[href], .cta[href]'
+        try:
+            tree = HTMLParser(html_bytes)
+            hrefs = [node.attributes.get('href') for node in tree.css(link_selector)]
+        except Exception as e:
+            print(f"⚠️ selectolax failed, falling back to lxml: {e}")
+            tree = lxml.html.fromstring(html_bytes)
+            hrefs = tree.xpath(
+                '//a/@href | //*[contains(@class, "button") or contains(@class, "btn") '
+                'or contains(@class, "cta")]/@href'
+            )
         
-        for method in methods:
-            try:
-                elements = method()
-                for element in elements:
-                    href = element.get('href', '').strip()
-                    if href and not href.startswith(('javascript:', 'mailto:', 'tel:', '#')):
-                        full_url = urljoin(domain, href)
-                        if self._is_valid_url(full_url):
-                            links.add(full_url)
-            except Exception as e:
-                print(f"⚠️ Error in link extraction method: {e}")
-                continue
+        for href in hrefs:
+            href = (href or '').strip()
+            if href and not _SKIP_RE.match(href):
+                full_url = href if href.startswith(('http://', 'https://')) else urljoin(domain, href)
+                if self._is_valid_url(full_url):
+                    links.add(full_url)
         
-        return list(links)
+        return links
     
-    def _get_all_sitemap_links(self, domain: str) -> List[str]:
+    def _get_all_sitemap_links(self, domain: str) -> Set[str]:
         """Extract all links from sitemap(s) with better error handling and loop protection"""
-        all_sitemap_links = set()
-        processed_sitemaps = set()
-        
         try:
             # Find sitemap locations
             sitemap_urls = self._discover_sitemap_urls(domain)
             print(f"Discovered {len(sitemap_urls)} potential sitemap locations")
+            return self._walk_sitemap_tree(sitemap_urls)
+        except Exception as e:
+            print(f"❌ Error processing sitemaps: {e}")
+            return set()
+    
+    def _walk_sitemap_tree(self, roots: List[str]) -> Set[str]:
+        """Breadth-first walk over sitemap indexes, fetching each sitemap exactly once"""
+        urls = set()
+        
+        # Work queue of sitemaps; `visited` stops cycles, `max_sitemaps` bounds the work per site
+        queue = deque(dict.fromkeys(roots))
+        visited = set(queue)
+        max_sitemaps = 50
+        submitted = 0
+        in_flight = set()
+        
+        while queue or in_flight:
+            # Keep every worker busy, submitting nested sitemaps as soon as they are found
+            while queue and len(in_flight) < self.max_workers and submitted < max_sitemaps:
+                in_flight.add(self.executor.submit(self._fetch_sitemap, queue.popleft()))
+                submitted += 1
             
-            # Process each sitemap URL with protection against infinite loops
-            sitemap_queue = list(sitemap_urls)
-            max_iterations = 50  # Safety limit to prevent infinite loops
-            iterations = 0
+            if not in_flight:
+                break
             
-            while sitemap_queue and iterations < max_iterations:
-                iterations += 1
-                sitemap_url = sitemap_queue.pop(0)
-                
-                if sitemap_url in processed_sitemaps:
-                    continue
-                    
-                if not self._check_url_exists(sitemap_url):
-                    continue
-                    
-                print(f"🔍 Processing sitemap: {sitemap_url}")
-                processed_sitemaps.add(sitemap_url)
-                
-                # Extract links from this sitemap
-                links = self._extract_links_from_sitemap(sitemap_url)
-                all_sitemap_links.update(links)
-                print(f"Found {len(links)} links in {sitemap_url}")
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                links, nested_sitemaps = future.result()
+                urls.update(links)
                 
-                # If it's a sitemap index, process nested sitemaps
-                if self._is_sitemap_index(sitemap_url):
-                    print("📂 This is a sitemap index, processing nested sitemaps...")
-                    nested_sitemaps = self._extract_nested_sitemaps(sitemap_url)
-                    
-                    # Add new sitemaps to queue for processing
-                    for nested_sitemap in nested_sitemaps:
-                        if (nested_sitemap not in processed_sitemaps and 
-                            nested_sitemap not in sitemap_queue):
-                            sitemap_queue.append(nested_sitemap)
-            
-            if iterations >= max_iterations:
-                print("⚠️ Reached maximum sitemap processing iterations (safety limit)")
-            
+                for nested_sitemap in nested_sitemaps:
+                    if nested_sitemap not in visited:
+                        visited.add(nested_sitemap)
+                        queue.append(nested_sitemap)
+        
+        if queue:
+            print(f"⚠️ Reached maximum of {max_sitemaps} sitemaps, skipping {len(queue)} more")
+        
+        return urls
+    
+    def _fetch_sitemap(self, sitemap_url: str) -> Tuple[Set[str], List[str]]:
+        """Fetch and parse one sitemap in a single pass (runs on the executor).
+        
+        <loc> entries under <sitemap> are nested sitemaps of an index; all others are page URLs.
+        """
+        cached = self._page_cache_get('sitemap:' + sitemap_url)
+        if cached is not None:
+            links, nested_sitemaps = orjson.loads(cached)
+            return set(links), nested_sitemaps
+        
+        links = set()
+        nested_sitemaps = []
+        
+        try:
+            for parent_tag, url in self._iter_sitemap_locs(sitemap_url):
+                if parent_tag == 'sitemap':
+                    nested_sitemaps.append(url)
+                elif url and self._is_valid_url(url):
+                    links.add(url)
+        except requests.HTTPError:
+            # Missing or temporarily failing (e.g. 503) sitemap: not cached, so the next
+            # run asks again instead of skipping the site's sitemap for a day
+            return links, nested_sitemaps
         except Exception as e:
-            print(f"❌ Error processing sitemaps: {e}")
+            print(f"⚠️ Could not parse sitemap {sitemap_url}: {e}")
+            return links, nested_sitemaps
+        
+        if links or nested_sitemaps:
+            print(f"🔍 Sitemap {sitemap_url}: {len(links)} links, {len(nested_sitemaps)} nested sitemaps")
+        self._page_cache_put('sitemap:' + sitemap_url, orjson.dumps([list(links), nested_sitemaps]))
         
-        return list(all_sitemap_links)
+        return links, nested_sitemaps
     
     def _discover_sitemap_urls(self, domain: str) -> List[str]:
         """Discover all possible sitemap URLs"""
@@ -495,190 +1032,124 @@ class PricingExtractor:
         
         return sitemap_urls
     
-    def _extract_links_from_sitemap(self, sitemap_url: str) -> List[str]:
-        """Extract all links from a sitemap"""
-        links = set()
-        
+    def _iter_sitemap_locs(self, sitemap_url: str):
+        """Stream (parent tag, url) pairs for every <loc> in a sitemap without building a full tree.
+        Raises requests.HTTPError for non-200 responses."""
+        with self._host_slot(sitemap_url):
+            response = self.session.get(sitemap_url, stream=True, timeout=10)
         try:
-            response = self.session.get(sitemap_url, timeout=10)
-            
-            # Handle different sitemap formats
-            if 'xml' in sitemap_url:
-                soup = BeautifulSoup(response.content, 'xml')
-                
-                # Extract URLs from sitemap
-                for loc in soup.find_all('loc'):
-                    url = loc.text.strip()
-                    if url and self._is_valid_url(url):
-                        links.add(url)
-                
-                # Also check url tags
-                for url_tag in soup.find_all('url'):
-                    loc = url_tag.find('loc')
-                    if loc and loc.text:
-                        url = loc.text.strip()
-                        if self._is_valid_url(url):
-                            links.add(url)
-            else:
-                # Handle text sitemaps or other formats
-                print(f"⚠️ Non-XML sitemap format: {sitemap_url}")
-                        
-        except Exception as e:
-            print(f"❌ Error extracting links from sitemap {sitemap_url}: {e}")
-        
-        return list(links)
-    
-    
-    def _is_sitemap_index(self, sitemap_url: str) -> bool:
-        """Check if sitemap is an index file with better detection"""
-        try:
-            # First check URL pattern for common index indicators
-            if any(pattern in sitemap_url.lower() for pattern in [
-                'sitemap_index', 'sitemap-index', 'sitemap.index', 
-                'index.xml', 'sitemap.xml/index'
-            ]):
-                return True
-            
-            # Then check content
-            response = self.session.head(sitemap_url, timeout=5)
             if response.status_code != 200:
-                return False
-                
-            # For large files, check content-type first
-            content_type = response.headers.get('content-type', '').lower()
-            if 'xml' not in content_type:
-                return False
-            
-            # Only download and check content if necessary
-            response = self.session.get(sitemap_url, timeout=5)
-            content = response.content.lower()
+                raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
             
-            # Check for sitemap index indicators
-            index_indicators = [
-                b'sitemapindex',
-                b'sitemap_index', 
-                b'<sitemapindex',
-                b'<sitemapindex>',
-                b'sitemap-type="index"'
-            ]
+            response.raw.decode_content = True
+            source = response.raw
             
-            return any(indicator in content for indicator in index_indicators)
+            # .gz sitemaps served without Content-Encoding still need gunzipping
+            if sitemap_url.lower().endswith('.gz') and 'gzip' not in response.headers.get('content-encoding', ''):
+                source = gzip.GzipFile(fileobj=source)
             
-        except Exception as e:
-            print(f"⚠️ Error checking if sitemap is index: {e}")
-            return False
+            for _, elem in etree.iterparse(source, events=('end',), tag='{*}loc'):
+                parent = elem.getparent()
+                parent_tag = etree.QName(parent).localname if parent is not None else ''
+                if elem.text:
+                    yield parent_tag, elem.text.strip()
+                
+                # Free processed <url>/<sitemap> entries to keep memory flat
+                elem.clear()
+                if parent is not None and parent.getparent() is not None:
+                    while parent.getprevious() is not None:
+                        del parent.getparent()[0]
+        finally:
+            response.close()
     
-    def _extract_nested_sitemaps(self, sitemap_index_url: str, processed_urls: set = None, depth: int = 0) -> List[str]:
-        """Extract nested sitemap URLs from index with protection against infinite loops"""
-        if processed_urls is None:
-            processed_urls = set()
-        
-        # Prevent infinite recursion
-        if depth > 10:  # Maximum depth limit
-            print(f"⚠️ Maximum sitemap depth reached ({depth}), stopping recursion")
-            return []
-        
-        if sitemap_index_url in processed_urls:
-            print(f"⚠️ Already processed sitemap: {sitemap_index_url}")
-            return []
-        
-        processed_urls.add(sitemap_index_url)
-        nested_sitemaps = []
-        
-        try:
-            response = self.session.get(sitemap_index_url, timeout=10)
-            soup = BeautifulSoup(response.content, 'xml')
-            
-            # Track found URLs to avoid duplicates
-            found_urls = set()
-            
-            # Look for sitemap tags in sitemap index
-            sitemap_tags = soup.find_all('sitemap')
-            for sitemap_tag in sitemap_tags:
-                loc = sitemap_tag.find('loc')
-                if loc and loc.text:
-                    url = loc.text.strip()
-                    if url not in found_urls:
-                        found_urls.add(url)
-                        nested_sitemaps.append(url)
-            
-            # Also try alternative format
-            if not sitemap_tags:
-                loc_tags = soup.find_all('loc')
-                for loc_tag in loc_tags:
-                    url = loc_tag.text.strip()
-                    if (url != sitemap_index_url and 
-                        url not in found_urls and 
-                        ('sitemap' in url.lower() or '.xml' in url)):
-                        found_urls.add(url)
-                        nested_sitemaps.append(url)
-            
-            print(f"📂 Found {len(nested_sitemaps)} nested sitemaps at depth {depth}")
-            
-            # Recursively process nested sitemaps that are also indexes
-            additional_sitemaps = []
-            for nested_sitemap in nested_sitemaps[:]:  # Copy list to avoid modification during iteration
-                if nested_sitemap not in processed_urls:
-                    try:
-                        # Check if this nested sitemap is also an index
-                        if self._is_sitemap_index(nested_sitemap):
-                            print(f"🔍 Nested sitemap is also an index, processing recursively...")
-                            deeper_sitemaps = self._extract_nested_sitemaps(
-                                nested_sitemap, processed_urls, depth + 1
-                            )
-                            additional_sitemaps.extend(deeper_sitemaps)
-                    except Exception as e:
-                        print(f"⚠️ Error checking nested sitemap {nested_sitemap}: {e}")
-                        continue
-            
-            # Add the additional sitemaps found through recursion
-            nested_sitemaps.extend(additional_sitemaps)
-            
-        except Exception as e:
-            print(f"❌ Error extracting nested sitemaps from {sitemap_index_url}: {e}")
-        
-        return list(set(nested_sitemaps))  # Remove duplicates
+    def _chat(self, system: str, prompt: str) -> str:
+        """Send one chat completion, holding an AI slot so concurrent sites stay under the rate limit"""
+        with self._llm_slots:
+            completion = self.client.chat.completions.create(
+                model=_AI_MODEL,  # Use the Grok model directly
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": prompt}
+                ],
+                timeout=60  # 60 second timeout for AI calls
+            )
+        return completion.choices[0].message.content
     
-    def _ai_identify_pricing_links(self, domain: str, all_links: List[str]) -> List[str]:
+    def _ai_identify_pricing_links(self, domain: str, all_links: Set[str]) -> List[str]:
         """Use AI to identify which links are likely pricing pages"""
         print("🤖 Using AI to analyze links and identify pricing pages...")
         
         # Always include homepage for direct pricing analysis
-        if domain not in all_links:
-            all_links.append(domain)
+        all_links = list(all_links | {domain})
+        
+        # The same link set gets the same answer, so reuse a recent pick and skip the AI call
+        cache_key = 'links:' + '\n'.join(sorted(all_links))
+        cached = self._page_cache_get(cache_key, ttl=_LINK_CACHE_TTL)
+        if cached is not None:
+            pricing_urls = orjson.loads(cached)
+            print(f"💾 Reusing cached AI pick of {len(pricing_urls)} pricing URLs")
+            return pricing_urls
         
         # Limit the number of links to avoid token limits, but prioritize important ones
         max_links = 400
         if len(all_links) > max_links:
             print(f"Too many links ({len(all_links)}), sampling {max_links} for AI analysis")
             
-            # Prioritize links that look promising
-            high_priority = [link for link in all_links if any(keyword in link.lower() for keyword in 
-                              ['pricing', 'price', 'plan', 'buy', 'subscribe', 'order', 'checkout'])]
-            medium_priority = [link for link in all_links if any(keyword in link.lower() for keyword in 
-                               ['product', 'feature', 'service', 'solution', 'package', 'tier'])]
-            low_priority = [link for link in all_links if link not in high_priority + medium_priority]
+            # Prioritize links that look promising. Only the part after the site's own
+            # origin is classified, so a domain like "planhat.com" doesn't make every link
+            # high priority, and each regex scans a shorter string
+            origin = domain.rstrip('/')
+            high_priority = []
+            medium_priority = []
+            low_priority = []
+            for link in all_links:
+                tail = link[len(origin):] if link.startswith(origin) else link
+                if _HIGH_RE.search(tail):
+                    high_priority.append(link)
+                elif _MED_RE.search(tail):
+                    medium_priority.append(link)
+                else:
+                    low_priority.append(link)
+            
+            # Take high priority first, then medium, then low; an insertion-ordered dict
+            # keeps the picks deduplicated with O(1) membership checks
+            picked = {}
             
-            # Take high priority first, then medium, then low
-            sampled_links = high_priority[:max_links//3]
-            remaining = max_links - len(sampled_links)
-            sampled_links.extend(medium_priority[:remaining//2])
-            remaining = max_links - len(sampled_links)
-            sampled_links.extend(low_priority[:remaining])
+            def take(links: List[str], count: int):
+                for link in links[:count]:
+                    picked.setdefault(link, None)
+            
+            take(high_priority, max_links // 3)
+            take(medium_priority, (max_links - len(picked)) // 2)
+            take(low_priority, max_links - len(picked))
             
             # Always include homepage
-            if domain not in sampled_links:
-                sampled_links.append(domain)
-                
-            all_links = sampled_links
+            picked.setdefault(domain, None)
+            all_links = list(picked)
+        
+        # Send same-site URLs as root-relative paths to cut prompt tokens; other hosts stay
+        # absolute. Shortening against the origin (not the CSV URL, which may have a path)
+        # keeps the paths exact when urljoin resolves the AI's answers below.
+        parsed_domain = _cached_urlparse(domain)
+        origin = f"{parsed_domain.scheme}://{parsed_domain.netloc}"
+        
+        def compact(link: str) -> str:
+            rest = link[len(origin):] if link.startswith(origin) else None
+            if rest is not None and (not rest or rest[0] in '/?#'):
+                return rest or '/'
+            return link
+        
+        compact_links = [compact(link) for link in all_links]
+        home_path = compact(domain)
         
         prompt = f"""
         Analyze this list of URLs from {domain} and identify which ones likely contain pricing information.
+        Paths are relative to {origin}; absolute URLs belong to other hosts.
 
         URLS TO ANALYZE:
-        {json.dumps(all_links, indent=2)}
+        {orjson.dumps(compact_links).decode()}
 
-        IMPORTANT: The homepage ({domain}) might contain pricing directly without needing a separate page.
+        IMPORTANT: The homepage ("{home_path}") might contain pricing directly without needing a separate page.
 
         Look for:
         1. Obvious pricing pages (/pricing, /plans, /price)
@@ -687,18 +1158,18 @@ class PricingExtractor:
         4. Checkout or order pages
         5. The homepage itself if it shows pricing
 
-        Return JSON with the most likely pricing URLs:
+        Return JSON with the most likely pricing URLs, using the paths exactly as listed:
 
         {{
             "pricing_urls": [
-                "https://example.com/pricing",
-                "https://example.com",  // homepage if it has pricing
-                "https://example.com/product/enterprise"  
+                "/pricing",
+                "{home_path}",  // homepage if it has pricing
+                "/product/enterprise"
             ],
             "confidence_scores": {{
-                "https://example.com/pricing": "high",
-                "https://example.com": "medium",
-                "https://example.com/product/enterprise": "low"
+                "/pricing": "high",
+                "{home_path}": "medium",
+                "/product/enterprise": "low"
             }}
         }}
 
@@ -706,35 +1177,22 @@ class PricingExtractor:
         """
         
         try:
-            completion = self.client.chat.completions.create(
-                model="grok-code-fast-1",  # Use the Grok model directly
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that analyzes websites to identify pricing pages."},
-                    {"role": "user", "content": prompt}
-                ],
-                timeout=60  # 60 second timeout for AI calls
-            )
-            
-            response_text = completion.choices[0].message.content
+            response_text = self._chat("You are a helpful assistant that analyzes websites to identify pricing pages.", prompt)
             print(f"AI response received: {len(response_text)} characters")
             
             # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-                pricing_urls = result.get('pricing_urls', [])
+            result = _parse_json_object(response_text)
+            if result is not None:
+                pricing_urls = [urljoin(domain, path) for path in result.get('pricing_urls', [])]
+                pricing_urls = list(dict.fromkeys(pricing_urls))
                 
-                # Verify URLs exist
-                valid_urls = []
+                # Not validated here: extraction fetches each URL anyway and rejects HTTP errors
                 for url in pricing_urls:
-                    if self._check_url_exists(url):
-                        valid_urls.append(url)
-                        print(f"✅ AI identified valid pricing URL: {url}")
-                    else:
-                        print(f"❌ AI suggested URL doesn't exist: {url}")
+                    print(f"✅ AI identified pricing URL: {url}")
                 
-                print(f"✅ AI identified {len(valid_urls)} valid pricing URLs")
-                return valid_urls
+                print(f"✅ AI identified {len(pricing_urls)} pricing URLs")
+                self._page_cache_put(cache_key, orjson.dumps(pricing_urls))
+                return pricing_urls
             else:
                 print("❌ AI returned invalid JSON format")
                 # Fallback: return obvious pricing URLs
@@ -745,109 +1203,163 @@ class PricingExtractor:
             # Fallback to obvious pricing URLs
             return self._fallback_pricing_urls(domain, all_links)
     
-    def _fallback_pricing_urls(self, domain: str, all_links: List[str]) -> List[str]:
+    def _fallback_pricing_urls(self, domain: str, all_links: Iterable[str]) -> List[str]:
         """Fallback method when AI fails"""
         print("🔄 Using fallback method to find pricing URLs")
         
-        pricing_keywords = ['pricing', 'price', 'plans', 'plan', 'subscribe', 'buy', 'order']
-        fallback_urls = []
-        
-        # Check for obvious pricing URLs
-        for link in all_links:
-            if any(keyword in link.lower() for keyword in pricing_keywords):
-                if self._check_url_exists(link):
-                    fallback_urls.append(link)
-        
-        # Always include homepage
-        if domain not in fallback_urls and self._check_url_exists(domain):
-            fallback_urls.append(domain)
+        # Obvious pricing URLs and the homepage were discovered on the site, so just try them
+        # Match keywords after the site's origin only (see _ai_identify_pricing_links)
+        origin = domain.rstrip('/')
+        fallback_urls = [
+            link for link in all_links
+            if _PRICING_RE.search(link[len(origin):] if link.startswith(origin) else link)
+        ]
+        fallback_urls.append(domain)
         
-        # Check common paths
-        common_paths = ['/pricing', '/price', '/plans', '/plan', '/subscription']
-        for path in common_paths:
-            url = urljoin(domain, path)
-            if self._check_url_exists(url) and url not in fallback_urls:
-                fallback_urls.append(url)
+        # Common paths are guesses; validate them in one batch
+        url_exists = self._check_urls_exist_batch([urljoin(domain, path) for path in _COMMON_PRICING_PATHS])
+        fallback_urls.extend(url for url, exists in url_exists.items() if exists)
+        fallback_urls = list(dict.fromkeys(fallback_urls))
         
         print(f"Fallback found {len(fallback_urls)} pricing URLs")
         return fallback_urls
     
     def _is_valid_url(self, url: str) -> bool:
         """Check if URL is valid and belongs to the same domain"""
-        try:
-            parsed = urlparse(url)
-            if not parsed.scheme or not parsed.netloc:
-                return False
-            
-            # Avoid non-HTTP URLs and common non-content URLs
-            if any(url.lower().endswith(ext) for ext in ['.pdf', '.jpg', '.png', '.gif', '.zip', '.exe', '.css', '.js']):
-                return False
-                
-            return True
-        except:
-            return False
+        return _is_crawlable_url(url)
 
     def analyze_pricing_with_ai(self, content: str, url: str) -> Dict:
         """Use AI to analyze pricing content and return structured JSON"""
         print("🧠 Analyzing pricing content with AI...")
         
-        prompt = f"""
-        Analyze this pricing page content from {url} and extract pricing information.
-
-        CONTENT:
-        {content}
-
-        Extract to this JSON format:
-        {{
-          "currency": "usd",
-          "plans": [
-            {{
-              "name": "Plan Name",
-              "description": "Plan description",
-              "pricing_tiers": [
-                {{
-                  "type": "recurring",
-                  "usage_type": "licensed",
-                  "billing_period": "monthly",
-                  "price": 0.0,
-                  "currency": "usd",
-                  "features": ["feature1", "feature2"]
-                }}
-              ]
-            }}
-          ]
-        }}
-
-        Return ONLY valid JSON.
-        """
+        # Instructions and schema live in the fixed system prompt; only the page varies
+        prompt = f"URL: {url}\n\nCONTENT:\n{content}"
         
         try:
-            completion = self.client.chat.completions.create(
-                model="grok-code-fast-1",  # Use the Grok model directly
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that analyzes pricing content and extracts structured pricing information."},
-                    {"role": "user", "content": prompt}
-                ],
-                timeout=60  # 60 second timeout for AI calls
-            )
-            
-            response_text = completion.choices[0].message.content
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
+            response_text = self._chat(_PRICING_SYSTEM_PROMPT, prompt)
+            result = _parse_json_object(response_text)
+            if result is not None:
+                return result
             else:
                 return {"error": "No valid JSON found", "raw_response": response_text[:500]}
                 
         except Exception as e:
             return {"error": f"AI analysis failed: {str(e)}"}
 
-    def get_pricing_data(self, domain: str, name: str) -> Dict:
-        """Main method to get pricing data for a domain with safety limits"""
+    def analyze_pricing_batch(self, pages: List[Tuple[str, str]]) -> List[Dict]:
+        """Analyze (url, content) pages, serving unchanged content from the AI cache and sending
+        the rest in one AI request; returns one result per page"""
+        keys = [hashlib.blake2b((_AI_CACHE_SALT + '\0' + content).encode('utf-8'), digest_size=16).digest() for _, content in pages]
+        with self._cache_lock:
+            cached = {
+                key: orjson.loads(value)
+                for key, value in self._cache_db.execute(
+                    f"SELECT h, json FROM ai_cache WHERE h IN ({','.join('?' * len(keys))})", keys
+                )
+            }
+        
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        if missing:
+            if len(missing) < len(pages):
+                print(f"💾 {len(pages) - len(missing)} page(s) served from AI cache")
+            fresh = self._analyze_pricing_batch_uncached([pages[i] for i in missing])
+            
+            # Errors are transient, so only real analyses are cached
+            rows = [(keys[i], orjson.dumps(result).decode()) for i, result in zip(missing, fresh) if 'error' not in result]
+            if rows:
+                with self._cache_lock:
+                    self._cache_db.executemany("INSERT OR REPLACE INTO ai_cache VALUES (?, ?)", rows)
+                    self._cache_db.commit()
+            cached.update((keys[i], result) for i, result in zip(missing, fresh))
+        
+        return [cached[key] for key in keys]
+    
+    def _analyze_pricing_batch_uncached(self, pages: List[Tuple[str, str]]) -> List[Dict]:
+        """Analyze several (url, content) pages in one AI request; returns one result per page"""
+        if len(pages) == 1:
+            url, content = pages[0]
+            return [self.analyze_pricing_with_ai(content, url)]
+        
+        print(f"🧠 Analyzing {len(pages)} pricing pages with AI in one request...")
+        
+        # Explicit open/close markers keep page boundaries unambiguous even when page text
+        # itself contains headings
+        sections = "\n\n".join(
+            f"<<DOC {i}>> url={url}\n{content}\n<<END>>"
+            for i, (url, content) in enumerate(pages, 1)
+        )
+        
+        prompt = f"{len(pages)} pages:\n\n{sections}"
+        
+        try:
+            response_text = self._chat(_BATCH_PRICING_SYSTEM_PROMPT, prompt)
+            items = _parse_json_array(response_text)
+            if items is None:
+                error = {"error": "No valid JSON array found", "raw_response": response_text[:500]}
+                return [dict(error) for _ in pages]
+            
+            # Match results to pages by their "page" number, falling back to position
+            by_page = {}
+            for position, item in enumerate(items, 1):
+                if isinstance(item, dict):
+                    try:
+                        page_number = int(item.pop('page', position))
+                    except (TypeError, ValueError):
+                        page_number = position
+                    item.pop('url', None)
+                    by_page.setdefault(page_number, item)
+            return [by_page.get(i, {"error": "No analysis returned for page"}) for i in range(1, len(pages) + 1)]
+                
+        except Exception as e:
+            return [{"error": f"AI analysis failed: {str(e)}"} for _ in pages]
+
+    def _first_priced_result(self, pages: List[Tuple[str, str]], name: str, domain: str) -> Optional[Dict]:
+        """Batch-analyze extracted pages and return the first one (in page order) that has plans"""
+        for (pricing_url, content), pricing_data in zip(pages, self.analyze_pricing_batch(pages)):
+            if 'plans' in pricing_data and pricing_data['plans']:
+                print(f"🎉 SUCCESS: Found {len(pricing_data['plans'])} pricing plans at {pricing_url}!")
+                pricing_data.update({
+                    "name": name,
+                    "domain": domain,
+                    "source_url": pricing_url,
+                    "success": True,
+                    "content_length": len(content)
+                })
+                return pricing_data
+            print(f"❌ No valid pricing data found at {pricing_url}")
+        return None
+
+    def get_pricing_data(self, domain: str, name: str, time_limit: Optional[float] = None) -> Dict:
+        """Main method to get pricing data for a domain with safety limits
+        
+        time_limit (seconds) is checked between phases and bounds the wait for candidate
+        pages; extractions still in flight when it expires are abandoned rather than
+        interrupted mid-request. run_pipeline enforces the same limit on the whole call.
+        """
+        deadline = time.monotonic() + time_limit if time_limit else None
         print(f"\n{'='*70}")
         print(f"🚀 ANALYZING: {name}")
         print(f"🌐 DOMAIN: {domain}")
         print(f"{'='*70}")
         
+        # Fast path: most sites serve pricing at a conventional path, so try those before
+        # crawling links and asking the AI to pick candidates
+        tried = []
+        common_urls = self._probe_common_pricing_paths(domain)
+        if common_urls:
+            print(f"⚡ Found {len(common_urls)} common pricing paths, trying them before link analysis")
+            try:
+                pricing_data = self._first_priced_candidate(common_urls, name, domain, deadline)
+            except FutureTimeoutError:
+                return self._timeout_result(name, domain, time_limit, common_urls)
+            if pricing_data:
+                return pricing_data
+            tried = common_urls
+        
+        expired = lambda: deadline is not None and time.monotonic() >= deadline
+        if expired():
+            return self._timeout_result(name, domain, time_limit, tried)
+        
         # Safety limit for pricing URL discovery
         try:
             pricing_urls = self.find_pricing_routes(domain)
@@ -860,11 +1372,18 @@ class PricingExtractor:
                 "success": False
             }
         
+        # Discovery (homepage render, sitemaps, AI link pick) can outlast the limit on its own
+        if expired():
+            return self._timeout_result(name, domain, time_limit, tried)
+        
+        # Pages from the fast path were already extracted and analyzed
+        pricing_urls = [url for url in pricing_urls if url not in tried]
         if not pricing_urls:
             return {
                 "name": name,
                 "domain": domain,
-                "error": "No pricing pages found",
+                "error": "All URLs failed to yield valid pricing data" if tried else "No pricing pages found",
+                "attempted_urls": tried,
                 "success": False
             }
         
@@ -875,122 +1394,97 @@ class PricingExtractor:
         if len(pricing_urls) > max_urls_to_try:
             print(f"⚠️ Too many URLs ({len(pricing_urls)}), limiting to first {max_urls_to_try}")
             pricing_urls = pricing_urls[:max_urls_to_try]
-        for i, pricing_url in enumerate(pricing_urls):
-            print(f"\n--- Attempt {i+1}/{len(pricing_urls)} ---")
-            print(f"🔗 Testing: {pricing_url}")
-            
-            try:
-                content = self.extract_pricing_content(pricing_url)
-                
-                if "Error" in content or len(content) < 100:
-                    print("❌ Content extraction failed or insufficient content")
-                    continue
-                
-                pricing_data = self.analyze_pricing_with_ai(content, pricing_url)
-                
-                if 'plans' in pricing_data and pricing_data['plans']:
-                    print(f"🎉 SUCCESS: Found {len(pricing_data['plans'])} pricing plans!")
-                    pricing_data.update({
-                        "name": name,
-                        "domain": domain,
-                        "source_url": pricing_url,
-                        "success": True,
-                        "content_length": len(content)
-                    })
-                    return pricing_data
-                else:
-                    print("❌ No valid pricing data found")
-                    
-            except Exception as e:
-                print(f"❌ Error processing URL {pricing_url}: {e}")
-                continue
+        
+        try:
+            pricing_data = self._first_priced_candidate(pricing_urls, name, domain, deadline)
+        except FutureTimeoutError:
+            return self._timeout_result(name, domain, time_limit, tried + pricing_urls)
+        if pricing_data:
+            return pricing_data
         
         return {
             "name": name,
             "domain": domain,
             "error": "All URLs failed to yield valid pricing data",
-            "attempted_urls": pricing_urls,
+            "attempted_urls": tried + pricing_urls,
             "success": False
         }
-
-def read_urls_from_csv(csv_file_path: str) -> List[Dict]:
-    """Read URLs from CSV file"""
-    urls = []
-    try:
-        with open(csv_file_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                urls.append({
-                    "name": row.get('name', ''),
-                    "website": row.get('website', '')
-                })
-        print(f"📋 Read {len(urls)} URLs from CSV")
-    except Exception as e:
-        print(f"❌ Error reading CSV file: {e}")
     
-    return urls
-
-def load_existing_results(output_file: str) -> Dict:
-    """Load existing results from JSON file if it exists"""
-    if os.path.exists(output_file):
-        try:
-            with open(output_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Check if this is a checkpoint file with nested structure
-            if isinstance(data, dict) and 'results' in data:
-                results = data['results']
-                print(f"📁 Loaded existing results from checkpoint with {len(results)} items")
-            else:
-                results = data
-                print(f"📁 Loaded existing results with {len(results)} items")
-            return results
-        except Exception as e:
-            print(f"❌ Error loading existing results: {e}")
-            return {}
-    return {}
-
-def save_checkpoint(output_file: str, results: Dict, processed_count: int, total_count: int):
-    """Save current progress as checkpoint"""
-    checkpoint_data = {
-        "results": results,
-        "processed_count": processed_count,
-        "total_count": total_count,
-        "timestamp": time.time()
-    }
+    def _probe_common_pricing_paths(self, domain: str) -> List[str]:
+        """Return the distinct pages that conventional pricing paths resolve to over plain HTTP.
+        
+        Paths redirected to the homepage (a common catch-all) don't count, and paths that
+        redirect to the same page are returned once, as that page's final URL.
+        """
+        candidates = [urljoin(domain, path) for path in _COMMON_PRICING_PATHS]
+        # Probes are memoized, so the fallback's later check of these paths reuses them
+        final_urls = self._probe_urls([domain] + candidates)
+        home = (final_urls[domain] or domain).rstrip('/')
+        return list(dict.fromkeys(
+            final_url for final_url in (final_urls[url] for url in candidates)
+            if final_url and final_url.rstrip('/') != home
+        ))
     
-    checkpoint_file = output_file.replace('.json', '_checkpoint.json')
-    try:
-        with open(checkpoint_file, 'w', encoding='utf-8') as f:
-            json.dump(checkpoint_data, f, indent=2, ensure_ascii=False)
-        print(f"💾 Checkpoint saved: {processed_count}/{total_count} processed")
-        
-        # In CI environments, also flush stdout to ensure progress is visible
-        if os.getenv('CI') or os.getenv('GITHUB_ACTIONS'):
-            import sys
-            sys.stdout.flush()
-            
-    except Exception as e:
-        print(f"❌ Error saving checkpoint: {e}")
-
-def load_checkpoint(output_file: str) -> Optional[Dict]:
-    """Load checkpoint if exists"""
-    checkpoint_file = output_file.replace('.json', '_checkpoint.json')
-    if os.path.exists(checkpoint_file):
+    def _first_priced_candidate(self, pricing_urls: List[str], name: str, domain: str,
+                                deadline: Optional[float]) -> Optional[Dict]:
+        """Extract candidates concurrently and return the first result with plans, or None.
+        
+        Raises FutureTimeoutError once the deadline passes.
+        """
+        # Extract all candidates concurrently and analyze them in batches bounded by total
+        # content size as they arrive; the first batch with plans wins and the rest are cancelled
+        max_batch_chars = 60000
+        pending = []
+        pending_chars = 0
+        futures = {self.executor.submit(self.extract_pricing_content, u): u for u in pricing_urls}
+        seen = set()
+        remaining = (lambda: max(0.0, deadline - time.monotonic())) if deadline else (lambda: None)
         try:
-            with open(checkpoint_file, 'r', encoding='utf-8') as f:
-                checkpoint = json.load(f)
-            print(f"🔄 Resuming from checkpoint: {checkpoint['processed_count']}/{checkpoint['total_count']} processed")
-            return checkpoint
-        except Exception as e:
-            print(f"❌ Error loading checkpoint: {e}")
-    return None
-
-def get_remaining_urls(all_urls: List[Dict], existing_results: Dict) -> List[Dict]:
-    """Get URLs that haven't been processed yet"""
-    processed_names = set(existing_results.keys())
-    remaining_urls = [url for url in all_urls if url['name'] not in processed_names]
-    return remaining_urls
+            for i, future in enumerate(as_completed(futures, timeout=remaining())):
+                seen.add(future)
+                pricing_url = futures[future]
+                print(f"\n--- Candidate {i+1}/{len(pricing_urls)} ---")
+                print(f"🔗 Testing: {pricing_url}")
+                
+                try:
+                    content = future.result()
+                    
+                    if "Error" in content or len(content) < 100:
+                        print("❌ Content extraction failed (invalid URL or HTTP error) or insufficient content")
+                        continue
+                    
+                    pending.append((pricing_url, content))
+                    pending_chars += len(content)
+                    # Keep batching while other finished pages are already waiting
+                    if pending_chars < max_batch_chars and any(f.done() and f not in seen for f in futures):
+                        continue
+                    
+                    pricing_data = self._first_priced_result(pending, name, domain)
+                    pending, pending_chars = [], 0
+                    if pricing_data:
+                        return pricing_data
+                        
+                except Exception as e:
+                    print(f"❌ Error processing URL {pricing_url}: {e}")
+                    continue
+        finally:
+            for future in futures:
+                future.cancel()
+        
+        if pending:
+            return self._first_priced_result(pending, name, domain)
+        return None
+    
+    def _timeout_result(self, name: str, domain: str, time_limit: float, attempted_urls: List[str]) -> Dict:
+        """Result for a site whose time limit ran out"""
+        print(f"⏰ Time limit of {time_limit:.0f}s reached for {name}")
+        return {
+            "name": name,
+            "domain": domain,
+            "error": f"Processing timeout: website processing exceeded {time_limit:.0f} seconds",
+            "attempted_urls": attempted_urls,
+            "success": False
+        }
 
 def main():
     # Configuration
@@ -1006,157 +1500,7 @@ def main():
         your_site_url=YOUR_SITE_URL,
         your_site_name=YOUR_SITE_NAME
     ) as extractor:
-        
-        # Read all URLs from CSV
-        all_urls = read_urls_from_csv(csv_file_path)
-        if not all_urls:
-            print("❌ No URLs found in CSV file!")
-            return
-          # Load existing results and checkpoint
-        existing_results = load_existing_results(output_file)
-        checkpoint = load_checkpoint(output_file)
-        
-        if checkpoint and checkpoint.get('results'):
-            # Resume from checkpoint
-            results = checkpoint['results']
-            processed_count = checkpoint['processed_count']
-            remaining_urls = get_remaining_urls(all_urls, results)
-            print(f"🔄 Resuming processing: {len(remaining_urls)} URLs remaining")
-        else:
-            # Start fresh
-            results = existing_results
-            remaining_urls = get_remaining_urls(all_urls, results)
-            processed_count = len(results)
-            print(f"🆕 Starting fresh: {len(remaining_urls)} URLs to process")
-        
-        total_count = len(all_urls)
-        successful_count = sum(1 for result in results.values() if result.get('success'))
-        
-        print(f"\n📊 Progress: {processed_count}/{total_count} processed, {successful_count} successful")
-        
-        # Process remaining URLs
-        for i, item in enumerate(remaining_urls):
-            # Don't clear terminal in CI environments to show progress
-            if not os.getenv('CI') and not os.getenv('GITHUB_ACTIONS'):
-                os.system('clear' if os.name == 'posix' else 'cls')
-            
-            name = item["name"]
-            website = item["website"]
-            
-            print(f"\n{'#'*80}")
-            print(f"🔄 PROCESSING {processed_count + i + 1}/{total_count}: {name}")
-            print(f"{'#'*80}")
-            
-            if not website or website.strip() == "":
-                print("❌ Skipping empty URL")
-                results[name] = {"error": "Empty URL", "success": False}
-                # Save checkpoint even for skipped items
-                save_checkpoint(output_file, results, processed_count + i + 1, total_count)
-                continue
-            
-            try:
-                if not website.startswith(('http://', 'https://')):
-                    website = 'https://' + website
-                
-                # Add timeout for individual website processing (10 minutes max per site)
-                import signal
-                
-                def timeout_handler(signum, frame):
-                    raise TimeoutError("Website processing timed out after 10 minutes")
-                
-                signal.signal(signal.SIGALRM, timeout_handler)
-                signal.alarm(600)  # 10 minutes timeout per website
-                
-                try:
-                    pricing_data = extractor.get_pricing_data(website, name)
-                    results[name] = pricing_data
-                finally:
-                    signal.alarm(0)  # Cancel the alarm
-                
-                if pricing_data.get('success'):
-                    successful_count += 1
-                    print(f"✅ SUCCESS: {name}")
-                else:
-                    print(f"❌ FAILED: {name}")
-                
-                # Print detailed progress in CI environments
-                if os.getenv('CI') or os.getenv('GITHUB_ACTIONS'):
-                    print(f"📊 PROGRESS UPDATE: {processed_count + i + 1}/{total_count} complete, {successful_count} successful")
-                    import sys
-                    sys.stdout.flush()
-                
-                # Save checkpoint after each successful processing
-                save_checkpoint(output_file, results, processed_count + i + 1, total_count)
-                
-                print("⏳ Waiting 2 seconds...")
-                time.sleep(2)
-                
-            except TimeoutError as e:
-                error_msg = f"Processing timeout: {str(e)}"
-                print(f"⏰ TIMEOUT ERROR: {error_msg}")
-                results[name] = {
-                    "name": name,
-                    "website": website,
-                    "error": error_msg,
-                    "success": False
-                }
-                # Save checkpoint even on timeout
-                save_checkpoint(output_file, results, processed_count + i + 1, total_count)
-                time.sleep(2)
-                
-            except Exception as e:
-                error_msg = f"Unexpected error: {str(e)}"
-                print(f"💥 CRITICAL ERROR: {error_msg}")
-                results[name] = {
-                    "name": name,
-                    "website": website,
-                    "error": error_msg,
-                    "success": False
-                }
-                # Save checkpoint even on error
-                save_checkpoint(output_file, results, processed_count + i + 1, total_count)
-                time.sleep(2)
-                
-            except Exception as e:
-                error_msg = f"Unexpected error: {str(e)}"
-                print(f"💥 CRITICAL ERROR: {error_msg}")
-                results[name] = {
-                    "name": name,
-                    "website": website,
-                    "error": error_msg,
-                    "success": False
-                }
-                # Save checkpoint even on error
-                save_checkpoint(output_file, results, processed_count + i + 1, total_count)
-                time.sleep(2)
-        
-        # Save final results
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
-        
-        # Clean up checkpoint file after successful completion
-        checkpoint_file = output_file.replace('.json', '_checkpoint.json')
-        if os.path.exists(checkpoint_file):
-            try:
-                os.remove(checkpoint_file)
-                print("🧹 Checkpoint file cleaned up")
-            except:
-                pass
-        
-        print(f"\n{'='*80}")
-        print(f"🎊 PROCESSING COMPLETE!")
-        print(f"📊 Total: {len(results)}, ✅ Successful: {successful_count}, ❌ Failed: {len(results) - successful_count}")
-        print(f"💾 Final results saved to: {output_file}")
-        print(f"{'='*80}")
-        
-        # Print failed items summary
-        failed_items = {name: result for name, result in results.items() if not result.get('success')}
-        if failed_items:
-            print(f"\n📋 Failed items ({len(failed_items)}):")
-            for name, result in failed_items.items():
-                print(f"   - {name}: {result.get('error', 'Unknown error')}")
-        
-        return results
+        return run_pipeline(csv_file_path, output_file, extractor, site_timeout=600)  # 10 minutes max per site
         
     
 if __name__ == "__main__":
@@ -0,0 +1,296 @@
+"""
+Shared driver for the pricing scripts: CSV input, checkpointing and the concurrent
+per-site loop. Each script only supplies its input/output files and an extractor.
+"""
+
+import os
+import sys
+import csv
+import time
+import orjson
+from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Checkpoint log lines are flushed to disk in groups: after this many sites or seconds
+CHECKPOINT_EVERY_SITES = 25
+CHECKPOINT_EVERY_SECONDS = 10.0
+
+# Longest the main loop waits before re-checking running sites against their deadlines
+DEADLINE_POLL_SECONDS = 5.0
+
+def read_urls_from_csv(csv_file_path: str) -> List[Tuple[str, str]]:
+    """Read unique (name, website) pairs from CSV file"""
+    urls = []
+    try:
+        with open(csv_file_path, 'r', encoding='utf-8', newline='') as file:
+            reader = csv.reader(file)
+            header = next(reader, [])
+            name_i = header.index('name')
+            web_i = header.index('website')
+            width = max(name_i, web_i) + 1
+            
+            # Canonicalize once here: drop empty websites, add a scheme and keep the
+            # first row for each name so the main loop only sees ready-to-fetch URLs
+            websites = {}
+            skipped = 0
+            for row in reader:
+                if len(row) < width:
+                    continue
+                name, website = row[name_i], row[web_i].strip()
+                if not website:
+                    skipped += 1
+                    continue
+                if not website.startswith(('http://', 'https://')):
+                    website = 'https://' + website
+                websites.setdefault(name, website)
+            urls = list(websites.items())
+        print(f"📋 Read {len(urls)} URLs from CSV ({skipped} empty skipped)")
+    except Exception as e:
+        print(f"❌ Error reading CSV file: {e}")
+    
+    return urls
+
+def load_existing_results(output_file: str) -> Dict:
+    """Load existing results from JSON file if it exists"""
+    if os.path.exists(output_file):
+        try:
+            with open(output_file, 'rb') as f:
+                data = orjson.loads(f.read())
+            
+            # Check if this is a checkpoint file with nested structure
+            if isinstance(data, dict) and 'results' in data:
+                results = data['results']
+                print(f"📁 Loaded existing results from checkpoint with {len(results)} items")
+            else:
+                results = data
+                print(f"📁 Loaded existing results with {len(results)} items")
+            return results
+        except Exception as e:
+            print(f"❌ Error loading existing results: {e}")
+            return {}
+    return {}
+
+def _checkpoint_paths(output_file: str) -> Tuple[str, str]:
+    """Legacy full-snapshot checkpoint and the append-only log that replaced it"""
+    return (output_file.replace('.json', '_checkpoint.json'),
+            output_file.replace('.json', '_checkpoint.jsonl'))
+
+def open_checkpoint_log(output_file: str):
+    """Open the append-only checkpoint log; each line records one finished site.
+    The large buffer holds lines until the caller flushes a group of them."""
+    return open(_checkpoint_paths(output_file)[1], 'ab', buffering=1 << 20)
+
+def append_result(fp, name: str, result: Dict):
+    """Append one site's result to the checkpoint log instead of rewriting every result"""
+    fp.write(orjson.dumps({name: result}, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS))
+
+def flush_checkpoint_log(fp):
+    """Push buffered log lines to disk so they survive a crash, not just an interrupt"""
+    fp.flush()
+    os.fsync(fp.fileno())
+
+def write_results(output_file: str, results: Dict):
+    """Write the final results atomically: a crash mid-write leaves the old file intact"""
+    tmp_file = output_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, output_file)
+
+def load_checkpoint(output_file: str) -> Optional[Dict]:
+    """Load checkpoint if exists, folding the log over any legacy snapshot (last write wins)"""
+    snapshot_file, log_file = _checkpoint_paths(output_file)
+    results = {}
+    found = False
+    
+    if os.path.exists(snapshot_file):
+        try:
+            with open(snapshot_file, 'rb') as f:
+                results.update(orjson.loads(f.read()).get('results', {}))
+            found = True
+        except Exception as e:
+            print(f"❌ Error loading checkpoint: {e}")
+    
+    if os.path.exists(log_file):
+        with open(log_file, 'rb') as f:
+            for line in f:
+                try:
+                    results.update(orjson.loads(line))
+                except ValueError:
+                    continue  # Partial line from an interrupted write
+        found = True
+    
+    if not found:
+        return None
+    
+    print(f"🔄 Resuming from checkpoint: {len(results)} processed")
+    return {"results": results, "processed_count": len(results)}
+
+def remove_checkpoint(output_file: str):
+    """Delete checkpoint files once the final results are written"""
+    for checkpoint_file in _checkpoint_paths(output_file):
+        if os.path.exists(checkpoint_file):
+            try:
+                os.remove(checkpoint_file)
+                print("🧹 Checkpoint file cleaned up")
+            except:
+                pass
+
+def get_remaining_urls(all_urls: List[Tuple[str, str]], existing_results: Dict) -> List[Tuple[str, str]]:
+    """Get URLs that haven't been processed yet"""
+    processed_names = existing_results.keys()  # set-like view, no copy
+    remaining_urls = [url for url in all_urls if url[0] not in processed_names]
+    return remaining_urls
+
+def run_pipeline(csv_path: str, output_file: str, extractor, site_timeout: float = 600,
+                 max_concurrent_sites: int = 8) -> Optional[Dict]:
+    """Scrape every remaining site in csv_path with extractor, resuming from and
+    checkpointing to output_file. Returns the final results, or None if the CSV is empty."""
+    # Start from a clean screen in local terminals (ANSI clear + home, no subprocess);
+    # redirected output and CI logs never get the control bytes
+    if sys.stdout.isatty() and not os.getenv('CI') and not os.getenv('GITHUB_ACTIONS'):
+        sys.stdout.write('\x1b[2J\x1b[H')
+    
+    # Read all URLs from CSV
+    all_urls = read_urls_from_csv(csv_path)
+    if not all_urls:
+        print("❌ No URLs found in CSV file!")
+        return None
+    
+    # Start from the saved results and fold the checkpoint over them (last write wins):
+    # the log only holds sites finished since it was opened, not earlier results
+    results = load_existing_results(output_file)
+    checkpoint = load_checkpoint(output_file)
+    resuming = bool(checkpoint and checkpoint.get('results'))
+    if resuming:
+        results.update(checkpoint['results'])
+    processed_count = len(results)
+    
+    # Work out what is left once; successful_count is then kept up to date as sites finish
+    remaining_urls = get_remaining_urls(all_urls, results)
+    if resuming:
+        print(f"🔄 Resuming processing: {len(remaining_urls)} URLs remaining")
+    else:
+        print(f"🆕 Starting fresh: {len(remaining_urls)} URLs to process")
+    
+    total_count = len(all_urls)
+    successful_count = sum(1 for result in results.values() if result.get('success'))
+    
+    print(f"\n📊 Progress: {processed_count}/{total_count} processed, {successful_count} successful")
+    
+    # Process remaining URLs several sites at a time; their page loads share the
+    # extractor's browser tabs while HTTP and AI calls overlap
+    completed = 0
+    unflushed = 0
+    last_flush = time.monotonic()
+    
+    def record(name, result):
+        nonlocal completed, successful_count, unflushed, last_flush
+        results[name] = result
+        completed += 1
+        
+        if result.get('success'):
+            successful_count += 1
+            print(f"✅ SUCCESS: {name}")
+        else:
+            print(f"❌ FAILED: {name} - {result.get('error', 'Unknown error')}")
+        
+        # Print detailed progress in CI environments
+        if os.getenv('CI') or os.getenv('GITHUB_ACTIONS'):
+            print(f"📊 PROGRESS UPDATE: {processed_count + completed}/{total_count} complete, {successful_count} successful")
+            sys.stdout.flush()
+        
+        # Log each finished site, flushing the checkpoint in groups; the finally below
+        # flushes whatever is left on completion, Ctrl+C or SIGTERM
+        append_result(checkpoint_log, name, result)
+        unflushed += 1
+        if unflushed >= CHECKPOINT_EVERY_SITES or time.monotonic() - last_flush >= CHECKPOINT_EVERY_SECONDS:
+            flush_checkpoint_log(checkpoint_log)
+            unflushed = 0
+            last_flush = time.monotonic()
+            print(f"💾 Checkpoint saved: {processed_count + completed}/{total_count} processed")
+    
+    # Each site's clock starts when a worker picks it up, not when it is queued
+    started = {}
+    
+    def run_site(name, website):
+        started[name] = time.monotonic()
+        return extractor.get_pricing_data(website, name, site_timeout)
+    
+    checkpoint_log = open_checkpoint_log(output_file)
+    pool = ThreadPoolExecutor(max_workers=max_concurrent_sites, thread_name_prefix='site')
+    try:
+        futures = {}
+        queued = []
+        for name, website in remaining_urls:
+            queued.append(f"🔄 QUEUED {name}: {website}\n")
+            futures[pool.submit(run_site, name, website)] = (name, website)
+        
+        # One write for the whole queue listing instead of a print per site
+        sys.stdout.write("".join(queued))
+        sys.stdout.flush()
+        
+        pending = set(futures)
+        while pending:
+            now = time.monotonic()
+            deadlines = [started[futures[f][0]] + site_timeout for f in pending if futures[f][0] in started]
+            timeout = min([DEADLINE_POLL_SECONDS] + [max(0.0, d - now) for d in deadlines])
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                name, website = futures[future]
+                try:
+                    pricing_data = future.result()
+                except Exception as e:
+                    error_msg = f"Unexpected error: {str(e)}"
+                    print(f"💥 CRITICAL ERROR: {error_msg}")
+                    pricing_data = {
+                        "name": name,
+                        "website": website,
+                        "error": error_msg,
+                        "success": False
+                    }
+                record(name, pricing_data)
+            
+            # Sites past their deadline are recorded as timed out; their thread can't be
+            # interrupted, so it finishes in the background and its late result is ignored
+            now = time.monotonic()
+            for future in [f for f in pending if started.get(futures[f][0], now) + site_timeout <= now]:
+                pending.discard(future)
+                name, website = futures[future]
+                print(f"⏰ Time limit of {site_timeout:.0f}s reached for {name}")
+                record(name, {
+                    "name": name,
+                    "domain": website,
+                    "error": f"Processing timeout: website processing exceeded {site_timeout:.0f} seconds",
+                    "success": False
+                })
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        checkpoint_log.close()
+    
+    # Save final results
+    write_results(output_file, results)
+    
+    # Clean up checkpoint file after successful completion
+    remove_checkpoint(output_file)
+    
+    print(f"\n{'='*80}")
+    print(f"🎊 PROCESSING COMPLETE!")
+    print(f"📊 Total: {len(results)}, ✅ Successful: {successful_count}, ❌ Failed: {len(results) - successful_count}")
+    print(f"💾 Final results saved to: {output_file}")
+    if results:
+        print(f"📈 Success rate: {(successful_count/len(results)*100):.1f}%")
+    print(f"{'='*80}")
+    
+    # Print summary of failed items
+    failed_items = {name: result for name, result in results.items() if not result.get('success')}
+    if failed_items:
+        print(f"\n📋 Failed items ({len(failed_items)}):")
+        for name, result in list(failed_items.items())[:10]:  # Show first 10
+            print(f"   - {name}: {result.get('error', 'Unknown error')}")
+        if len(failed_items) > 10:
+            print(f"   ... and {len(failed_items) - 10} more")
+    
+    return results